@@ -3,15 +3,33 @@ GUI Server for Network Slice Management
 Provides web interface and REST API endpoints for slice operations
 """
 
-from flask import Flask, render_template, request, jsonify
+from flask import Flask, render_template, request, jsonify, Response
+from metrics import MetricsRegistry, CONTENT_TYPE
 import requests
 import logging
 import json
+import math
+import os
+import time
 
 app = Flask(__name__)
 TOPOLOGY_FILE = "/tmp/topology.json"
 RYU_API_URL = "http://localhost:8080"
 
+# Canvas size the precomputed layout is scaled to (matches static/js/script.js)
+LAYOUT_WIDTH = 800
+LAYOUT_HEIGHT = 600
+
+# Node positions, recomputed only when the topology file changes
+_layout_cache = {"mtime": None, "positions": {}}
+
+# Metrics exposed at /metrics
+metrics = MetricsRegistry()
+ryu_proxy_latency = metrics.histogram(
+    'ryu_proxy_request_duration_seconds',
+    'Round-trip time of requests proxied from the GUI to the Ryu controller',
+    ['endpoint', 'status'])
+
 # Configure logging
 logging.basicConfig(level=logging.DEBUG)
 
@@ -43,6 +61,19 @@ def get_topology():
         logging.error(f"Error reading topology file: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/api/topology/layout')
+def get_topology_layout():
+    """
+    Get precomputed node positions for the topology visualization
+    Returns:
+        JSON response mapping node IDs to {"x": ..., "y": ...} coordinates
+    """
+    try:
+        return jsonify(get_cached_layout())
+    except Exception as e:
+        logging.error(f"Error computing topology layout: {str(e)}")
+        return jsonify({"error": str(e)}), 500
+
 @app.route('/api/slices')
 def get_slices():
     """
@@ -67,17 +98,19 @@ def activate_slice(slice_name):
     Activate a specific network slice
     Args:
         slice_name: Name of the slice to activate
+        mode: Optional JSON body field, "proactive" (default) or "reactive"
     Returns:
         JSON response with activation status
         - success: activation success message
         - error: error message if activation fails
     """
     try:
-        response = requests.post(
-            f"{RYU_API_URL}/simpleswitch/activate_slice",
-            json={"slice_name": slice_name},
-            timeout=30
-        )
+        payload = {"slice_name": slice_name}
+        # Optional activation mode ("proactive" or "reactive")
+        mode = (request.get_json(silent=True) or {}).get("mode")
+        if mode:
+            payload["mode"] = mode
+        response = _post_to_ryu("/simpleswitch/activate_slice", payload)
         # Forward Ryu controller's response
         return jsonify(response.json()), response.status_code
     except requests.exceptions.Timeout:
@@ -98,11 +131,7 @@ def deactivate_slice(slice_name):
         - error: error message if deactivation fails
     """
     try:
-        response = requests.post(
-            f"{RYU_API_URL}/simpleswitch/deactivate_slice",
-            json={"slice_name": slice_name},
-            timeout=30
-        )
+        response = _post_to_ryu("/simpleswitch/deactivate_slice", {"slice_name": slice_name})
         # Forward Ryu controller's response
         return jsonify(response.json()), response.status_code
     except requests.exceptions.Timeout:
@@ -111,6 +140,153 @@ def deactivate_slice(slice_name):
         logging.error(f"Error deactivating slice: {str(e)}")
         return jsonify({"error": str(e)}), 500
 
+@app.route('/metrics')
+def get_metrics():
+    """
+    Expose GUI server metrics
+    Returns:
+        Metrics in Prometheus text format
+    """
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
+
+def _post_to_ryu(endpoint, payload):
+    """
+    Forward a POST request to the Ryu controller, recording its latency
+    Args:
+        endpoint: Path of the Ryu REST endpoint
+        payload: JSON body to send
+    Returns:
+        requests.Response from the controller
+    """
+    start = time.perf_counter()
+    status = "error"
+    try:
+        response = requests.post(f"{RYU_API_URL}{endpoint}", json=payload, timeout=30)
+        status = str(response.status_code)
+        return response
+    except requests.exceptions.Timeout:
+        status = "timeout"
+        raise
+    finally:
+        ryu_proxy_latency.observe(time.perf_counter() - start,
+                                  endpoint=endpoint, status=status)
+
+def get_cached_layout():
+    """
+    Get node positions, recomputing them only if the topology file changed
+    Returns:
+        dict: Node ID -> {"x": ..., "y": ...}
+    """
+    mtime = os.path.getmtime(TOPOLOGY_FILE)
+    if _layout_cache["mtime"] != mtime:
+        with open(TOPOLOGY_FILE, 'r') as f:
+            topology = json.load(f)
+        _layout_cache["positions"] = compute_layout(topology)
+        _layout_cache["mtime"] = mtime
+        logging.debug(f"Computed layout for {len(_layout_cache['positions'])} nodes")
+    return _layout_cache["positions"]
+
+def compute_layout(topology):
+    """
+    Compute a radial tree layout of the topology
+    The centre of each component is placed in the middle of the canvas and its
+    BFS tree is spread on concentric rings, each subtree getting an angular
+    wedge proportional to its number of leaves. Runs in O(nodes + links), so the
+    browser only has to settle the force simulation instead of laying out from scratch.
+    Args:
+        topology: Topology data with nodes and links
+    Returns:
+        dict: Node ID -> {"x": ..., "y": ...}
+    """
+    node_ids = [node["id"] for node in topology.get("nodes", [])]
+    if not node_ids:
+        return {}
+
+    neighbors = {node_id: [] for node_id in node_ids}
+    for link in topology.get("links", []):
+        source, target = link["source"], link["target"]
+        if source in neighbors and target in neighbors:
+            neighbors[source].append(target)
+            neighbors[target].append(source)
+
+    # BFS forest rooted at the centre of each component
+    children = {}
+    order = []
+    visited = set()
+    roots = []
+    for node_id in node_ids:
+        if node_id in visited:
+            continue
+        # The middle of a longest BFS path approximates the component centre
+        far, _ = _bfs(node_id, neighbors)
+        path_order, parent = _bfs(far[-1], neighbors)
+        path = [path_order[-1]]
+        while parent[path[-1]] is not None:
+            path.append(parent[path[-1]])
+        root = path[len(path) // 2]
+
+        component, parent = _bfs(root, neighbors)
+        roots.append(root)
+        visited.update(component)
+        order.extend(component)
+        for member in component:
+            children[member] = []
+        for member in component[1:]:
+            children[parent[member]].append(member)
+
+    # With several components, hang them off a virtual centre node
+    root = roots[0]
+    if len(roots) > 1:
+        root = None
+        children[None] = roots
+        order.insert(0, None)
+
+    # Leaf counts bottom-up, depths top-down
+    leaves = {}
+    for node_id in reversed(order):
+        leaves[node_id] = sum(leaves[c] for c in children[node_id]) or 1
+    depth = {root: 0}
+    for node_id in order:
+        for child in children[node_id]:
+            depth[child] = depth[node_id] + 1
+
+    max_depth = max(depth.values()) or 1
+    ring = min(LAYOUT_WIDTH, LAYOUT_HEIGHT) * 0.45 / max_depth
+    center_x, center_y = LAYOUT_WIDTH / 2, LAYOUT_HEIGHT / 2
+
+    positions = {}
+    wedges = {root: (0.0, 2 * math.pi)}
+    for node_id in order:
+        start, end = wedges[node_id]
+        if node_id is not None:
+            angle = (start + end) / 2
+            radius = depth[node_id] * ring
+            positions[node_id] = {"x": round(center_x + radius * math.cos(angle), 1),
+                                  "y": round(center_y + radius * math.sin(angle), 1)}
+        span = (end - start) / leaves[node_id]
+        for child in children[node_id]:
+            wedges[child] = (start, start + span * leaves[child])
+            start += span * leaves[child]
+    return positions
+
+def _bfs(start, neighbors):
+    """
+    Breadth-first search from start
+    Args:
+        start: Node ID to start from
+        neighbors: Node ID -> list of adjacent node IDs
+    Returns:
+        tuple: (nodes in visit order, node ID -> BFS parent or None)
+    """
+    parent = {start: None}
+    queue = [start]
+    for node_id in queue:
+        for other in neighbors[node_id]:
+            if other not in parent:
+                parent[other] = node_id
+                queue.append(other)
+    return queue, parent
+
 def get_slice_ips(slice_name):
     try:
         with open(TOPOLOGY_FILE, "r") as f:
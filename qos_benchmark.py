@@ -0,0 +1,423 @@
+"""
+QoS Benchmark for Industrial Network
+Verifies that the HTB settings of each slice deliver their configured bandwidth under contention
+"""
+
+from mininet.log import info
+from urllib import request as urlrequest
+from urllib.error import HTTPError, URLError
+import json
+import re
+import time
+
+# fq_codel statistics as printed by `tc -s qdisc show`
+FQ_CODEL_STATS = re.compile(
+    r'qdisc fq_codel \d+: parent 1:(\d+)[^\n]*\n\s*'
+    r'Sent (\d+) bytes (\d+) pkt \(dropped (\d+), overlimits (\d+)')
+
+# Summary line printed by ping
+PING_RTT = re.compile(r'rtt min/avg/max/mdev = ([\d.]+)/([\d.]+)/([\d.]+)/([\d.]+) ms')
+PING_LOSS = re.compile(r'([\d.]+)% packet loss')
+
+# Start of the iperf3 error reported when the client cannot reach its server
+IPERF_CONNECT_FAILED = "unable to connect"
+
+class QoSBenchmark:
+    def __init__(self, net, qos_manager, slice_config, host_ips,
+                 duration=10, tolerance=0.1, streams=4, link_bandwidth=None,
+                 ryu_api_url="http://127.0.0.1:8080"):
+        """
+        Initialize QoS Benchmark
+        Args:
+            net: Mininet network instance
+            qos_manager: QoSManager that configured the hosts
+            slice_config: Dictionary containing slice configurations
+            host_ips: Dictionary mapping host names to IP addresses
+            duration: Length of each iperf3 run in seconds
+            tolerance: Allowed relative deviation from the target bandwidth
+            streams: Parallel TCP streams per flow, all sharing the slice class
+            link_bandwidth: Rate in Mbps the links are shaped to, or None if unshaped
+            ryu_api_url: Base URL of the Ryu controller REST API
+        """
+        self.net = net
+        self.qos_manager = qos_manager
+        self.slice_config = slice_config
+        self.host_ips = host_ips
+        self.duration = duration
+        self.tolerance = tolerance
+        self.streams = streams
+        self.link_bandwidth = link_bandwidth
+        self.ryu_api_url = ryu_api_url
+        self.base_port = 5201
+
+    def run(self, report_file="/tmp/qos_benchmark.json"):
+        """
+        Run concurrent intra-slice and cross-slice flows, then the contention
+        phase if links are shaped, and write a report
+        Args:
+            report_file: Path of the JSON report
+        Returns:
+            dict: The report
+        Raises:
+            RuntimeError: QoS was not configured on the hosts
+        """
+        # configure_qos gives up without the topology file, leaving no slice classes
+        if not self.qos_manager.slice_bandwidths:
+            raise RuntimeError("QoS is not configured; make sure /tmp/topology.json exists "
+                               "and configure_qos ran before the benchmark")
+
+        activated = self._activate_slices()
+        try:
+            flows = self._plan_flows()
+
+            qdisc_before = self._read_qdisc_stats()
+            results, latency = self._run_flows(flows)
+
+            contention = None
+            if self.link_bandwidth:
+                receiver, contention_flows = self._plan_contention()
+                if contention_flows:
+                    contention_results, _ = self._run_flows(contention_flows)
+                    contention = self._contention_result(receiver, contention_results)
+            else:
+                info("*** Links are not shaped, skipping the contention phase\n")
+            qdisc_after = self._read_qdisc_stats()
+        finally:
+            self._deactivate_slices(activated)
+
+        checks = [r["pass"] for r in results]
+        if contention:
+            checks += [s["pass"] for s in contention["slices"].values()]
+
+        report = {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "duration": self.duration,
+            "tolerance": self.tolerance,
+            "streams": self.streams,
+            "total_bandwidth_mbps": self.qos_manager.TOTAL_BANDWIDTH,
+            "flows": results,
+            "latency": latency,
+            "contention": contention,
+            "qdisc": self._qdisc_delta(qdisc_before, qdisc_after),
+            "summary": {
+                "passed": checks.count(True),
+                "failed": checks.count(False)
+            }
+        }
+
+        with open(report_file, "w") as f:
+            json.dump(report, f, indent=4)
+
+        self._log_report(report)
+        info(f"*** QoS benchmark report saved to {report_file}\n")
+        return report
+
+    def _activate_slices(self):
+        """
+        Activate every slice on the controller so that flows are forwarded
+        Returns:
+            list: Slices activated by the benchmark (already active ones are left alone)
+        """
+        activated = []
+        for slice_name in self.slice_config:
+            status = self._post_to_ryu("/simpleswitch/activate_slice", slice_name)
+            if status == 200:
+                activated.append(slice_name)
+            elif status != 409:
+                info(f"Warning: could not activate slice {slice_name} (status {status})\n")
+        return activated
+
+    def _deactivate_slices(self, slice_names):
+        """Deactivate the slices activated by the benchmark"""
+        for slice_name in slice_names:
+            self._post_to_ryu("/simpleswitch/deactivate_slice", slice_name)
+
+    def _post_to_ryu(self, endpoint, slice_name):
+        """
+        Send a slice request to the Ryu controller
+        Args:
+            endpoint: Path of the Ryu REST endpoint
+            slice_name: Name of the slice
+        Returns:
+            int: HTTP status code, or None if the controller is unreachable
+        """
+        req = urlrequest.Request(f"{self.ryu_api_url}{endpoint}",
+                                 data=json.dumps({"slice_name": slice_name}).encode(),
+                                 headers={"Content-Type": "application/json"},
+                                 method="POST")
+        try:
+            with urlrequest.urlopen(req, timeout=30) as response:
+                return response.status
+        except HTTPError as e:
+            return e.code
+        except URLError as e:
+            info(f"Error contacting controller: {e.reason}\n")
+            return None
+
+    def _plan_flows(self):
+        """
+        Choose the flows to run concurrently
+        Each host sends one flow of several parallel streams to the next host of
+        every slice it belongs to, so the streams compete within each HTB slice
+        class and every class should run at its ceiling. No link is oversubscribed
+        here; that is left to the contention phase.
+        One flow per pair of slices goes between hosts sharing no slice, which
+        must be blocked by the controller.
+        Returns:
+            list: Flow dictionaries (src, dst, slice, type, target_mbps)
+        """
+        slice_bandwidths = self.qos_manager.slice_bandwidths
+        flows = []
+        for slice_name, slice_info in self.slice_config.items():
+            hosts = slice_info["hosts"]
+            for i, src in enumerate(hosts):
+                dst = hosts[(i + 1) % len(hosts)]
+                if src != dst:
+                    flows.append({"src": src, "dst": dst, "slice": slice_name,
+                                  "type": "intra", "target_mbps": slice_bandwidths[slice_name]})
+
+        host_slices = self.qos_manager.host_slices
+        slice_names = list(self.slice_config)
+        seen = set()
+        for i, slice_a in enumerate(slice_names):
+            for slice_b in slice_names[i + 1:]:
+                pair = self._isolated_pair(slice_a, slice_b, host_slices)
+                if pair and pair not in seen:
+                    seen.add(pair)
+                    flows.append({"src": pair[0], "dst": pair[1], "slice": f"{slice_a}/{slice_b}",
+                                  "type": "cross", "target_mbps": 0})
+        return flows
+
+    def _plan_contention(self):
+        """
+        Choose flows oversubscribing the shaped link towards one host
+        Every other member of each slice of the host in most slices sends to it
+        at once. Each sender is capped by its own slice class, so together the
+        slices offer more than the link carries and have to share it.
+        Returns:
+            tuple: (receiver, flow dictionaries), or (None, []) if no host is in several slices
+        """
+        host_slices = self.qos_manager.host_slices
+        receiver = max(host_slices, key=lambda host_name: len(host_slices[host_name]))
+        slices = host_slices[receiver]
+        if len(slices) < 2:
+            info("*** No host belongs to several slices, skipping the contention phase\n")
+            return None, []
+
+        flows = []
+        for slice_name in slices:
+            for src in self.slice_config[slice_name]["hosts"]:
+                # Traffic of a sender sharing several slices with the receiver has no single slice
+                if src != receiver and len(set(host_slices[src]) & set(slices)) == 1:
+                    flows.append({"src": src, "dst": receiver, "slice": slice_name,
+                                  "type": "contention",
+                                  "target_mbps": self.qos_manager.slice_bandwidths[slice_name]})
+        return receiver, flows
+
+    def _contention_result(self, receiver, results):
+        """
+        Compare the share of the bottleneck each slice got to its bandwidth
+        Slices are expected to split the link in proportion to their configured
+        bandwidth. Switches do not queue per slice, so this shows whether the
+        host-side HTB shaping alone keeps the shares at a shared bottleneck.
+        Args:
+            receiver: Host whose link was oversubscribed
+            results: Flow results of the contention phase
+        Returns:
+            dict: Offered and received load and the per-slice shares
+        """
+        slice_bandwidths = self.qos_manager.slice_bandwidths
+        achieved = {}
+        for r in results:
+            achieved[r["slice"]] = achieved.get(r["slice"], 0) + r["achieved_mbps"]
+        received = sum(achieved.values())
+        weights = sum(slice_bandwidths[slice_name] for slice_name in achieved)
+
+        slices = {}
+        for slice_name, mbps in achieved.items():
+            expected = slice_bandwidths[slice_name] / weights
+            share = mbps / received if received else 0.0
+            slices[slice_name] = {
+                "achieved_mbps": round(mbps, 2),
+                "share": round(share, 3),
+                "expected_share": round(expected, 3),
+                "pass": received > 0 and abs(share - expected) <= expected * self.tolerance
+            }
+        return {
+            "receiver": receiver,
+            "link_mbps": self.link_bandwidth,
+            "offered_mbps": sum(r["target_mbps"] for r in results),
+            "received_mbps": round(received, 2),
+            "flows": results,
+            "slices": slices
+        }
+
+    def _isolated_pair(self, slice_a, slice_b, host_slices):
+        """Find hosts of slice_a and slice_b that share no slice, or None"""
+        for src in self.slice_config[slice_a]["hosts"]:
+            for dst in self.slice_config[slice_b]["hosts"]:
+                if not set(host_slices.get(src, [])) & set(host_slices.get(dst, [])):
+                    return (src, dst)
+        return None
+
+    def _run_flows(self, flows):
+        """
+        Run all iperf3 flows concurrently, with pings between intra-slice pairs
+        Args:
+            flows: Flow dictionaries from _plan_flows
+        Returns:
+            tuple: (flow results, latency results)
+        """
+        server_pids = []
+        for i, flow in enumerate(flows):
+            flow["port"] = self.base_port + i
+            flow["output"] = f"/tmp/qos_benchmark_{i}.json"
+            dst = self.net.get(flow["dst"])
+            pid = dst.cmd(f'iperf3 -s -1 -p {flow["port"]} > /dev/null 2>&1 & echo $!')
+            server_pids.append((dst, pid.strip()))
+        time.sleep(1)
+
+        pings = []
+        for i, flow in enumerate(flows):
+            src = self.net.get(flow["src"])
+            dst_ip = self.host_ips[flow["dst"]]
+            src.cmd(f'iperf3 -c {dst_ip} -p {flow["port"]} -t {self.duration} -P {self.streams} '
+                    f'--connect-timeout 2000 -J > {flow["output"]} 2>&1 &')
+            if flow["type"] == "intra":
+                ping_output = f"/tmp/qos_benchmark_ping_{i}.txt"
+                count = max(1, int(self.duration / 0.2))
+                src.cmd(f'ping -c {count} -i 0.2 {dst_ip} > {ping_output} 2>&1 &')
+                pings.append((flow, ping_output))
+
+        info(f"*** Running {len(flows)} concurrent flows for {self.duration}s\n")
+        time.sleep(self.duration + 3)
+
+        # Servers of blocked flows never get a client, stop them before waiting on the rest
+        for host, pid in server_pids:
+            if pid:
+                host.cmd(f'kill {pid} > /dev/null 2>&1')
+        for host_name in {flow["src"] for flow in flows}:
+            self.net.get(host_name).cmd('wait')
+
+        results = [self._flow_result(flow) for flow in flows]
+        latency = [self._ping_result(flow, path) for flow, path in pings]
+        return results, latency
+
+    def _flow_result(self, flow):
+        """
+        Parse the iperf3 output of a flow and compare it to its target
+        Args:
+            flow: Flow dictionary
+        Returns:
+            dict: Flow result
+        """
+        result = {key: flow[key] for key in ("src", "dst", "slice", "type", "target_mbps")}
+        achieved, error = 0.0, None
+        try:
+            with open(flow["output"], "r") as f:
+                data = json.load(f)
+            error = data.get("error")
+            if not error:
+                achieved = data["end"]["sum_received"]["bits_per_second"] / 1e6
+        except (OSError, ValueError, KeyError) as e:
+            error = f"Could not parse iperf3 output: {e}"
+
+        result["achieved_mbps"] = round(achieved, 2)
+        if flow["type"] == "intra":
+            target = flow["target_mbps"]
+            result["ratio"] = round(achieved / target, 3) if target else None
+            result["pass"] = not error and abs(achieved - target) <= target * self.tolerance
+        elif flow["type"] == "contention":
+            # Judged per slice by _contention_result
+            result["pass"] = not error
+        else:
+            # Hosts sharing no slice must not be able to exchange traffic. Only a
+            # failed connection shows that; a missing or broken iperf3 run does not
+            blocked = bool(error) and IPERF_CONNECT_FAILED in error
+            result["blocked"] = blocked
+            result["pass"] = blocked
+            if blocked:
+                error = None
+        if error:
+            result["error"] = error
+        return result
+
+    def _ping_result(self, flow, path):
+        """
+        Parse the ping output measured during a flow
+        Args:
+            flow: Flow dictionary
+            path: File containing the ping output
+        Returns:
+            dict: Latency result
+        """
+        result = {"src": flow["src"], "dst": flow["dst"], "slice": flow["slice"],
+                  "avg_ms": None, "max_ms": None, "loss_pct": None}
+        try:
+            with open(path, "r") as f:
+                output = f.read()
+        except OSError:
+            return result
+        rtt = PING_RTT.search(output)
+        if rtt:
+            result["avg_ms"] = float(rtt.group(2))
+            result["max_ms"] = float(rtt.group(3))
+        loss = PING_LOSS.search(output)
+        if loss:
+            result["loss_pct"] = float(loss.group(1))
+        return result
+
+    def _read_qdisc_stats(self):
+        """
+        Read fq_codel counters of every slice class
+        Returns:
+            dict: host -> class id -> {"bytes", "packets", "dropped", "overlimits"}
+        """
+        stats = {}
+        for host_name in self.qos_manager.host_classes:
+            output = self.net.get(host_name).cmd(f'tc -s qdisc show dev {host_name}-eth0')
+            stats[host_name] = {
+                int(class_id): {"bytes": int(sent_bytes), "packets": int(packets),
+                                "dropped": int(dropped), "overlimits": int(overlimits)}
+                for class_id, sent_bytes, packets, dropped, overlimits
+                in FQ_CODEL_STATS.findall(output)
+            }
+        return stats
+
+    def _qdisc_delta(self, before, after):
+        """
+        Compute fq_codel counter deltas over the benchmark, keyed by slice
+        Returns:
+            dict: host -> slice -> counter deltas
+        """
+        delta = {}
+        for host_name, classes in self.qos_manager.host_classes.items():
+            delta[host_name] = {}
+            for slice_name, class_id in classes.items():
+                start = before.get(host_name, {}).get(class_id, {})
+                end = after.get(host_name, {}).get(class_id, {})
+                delta[host_name][slice_name] = {
+                    key: end.get(key, 0) - start.get(key, 0)
+                    for key in ("bytes", "packets", "dropped", "overlimits")
+                }
+        return delta
+
+    def _log_report(self, report):
+        """Print a human readable summary of the report"""
+        info("\n*** QoS benchmark results\n")
+        for r in report["flows"]:
+            status = "PASS" if r["pass"] else "FAIL"
+            info(f"  [{status}] {r['type']:5} {r['src']}->{r['dst']} ({r['slice']}): "
+                 f"{r['achieved_mbps']}Mbps (target {r['target_mbps']}Mbps)\n")
+        for r in report["latency"]:
+            info(f"  ping {r['src']}->{r['dst']} ({r['slice']}): avg {r['avg_ms']}ms, "
+                 f"max {r['max_ms']}ms, loss {r['loss_pct']}%\n")
+        contention = report["contention"]
+        if contention:
+            info(f"  contention at {contention['receiver']}: {contention['offered_mbps']}Mbps offered, "
+                 f"{contention['received_mbps']}Mbps received over a {contention['link_mbps']}Mbps link\n")
+            for slice_name, s in contention["slices"].items():
+                status = "PASS" if s["pass"] else "FAIL"
+                info(f"  [{status}] share of {slice_name}: {s['share']} "
+                     f"(expected {s['expected_share']}, {s['achieved_mbps']}Mbps)\n")
+        info(f"*** {report['summary']['passed']} passed, {report['summary']['failed']} failed\n")
@@ -15,6 +15,12 @@ class QoSManager:
             total_bandwidth: Total available bandwidth (e.g., "10G", "1000M")
         """
         self.TOTAL_BANDWIDTH = self._parse_bandwidth(total_bandwidth)
+        # Slice name -> bandwidth in Mbps, filled by configure_qos
+        self.slice_bandwidths = {}
+        # Host name -> list of slice names, filled by configure_qos
+        self.host_slices = {}
+        # Host name -> {slice name: HTB class id}, filled by configure_qos
+        self.host_classes = {}
         info(f"Total bandwidth set to: {self.TOTAL_BANDWIDTH}Mbps\n")
         
     def _parse_bandwidth(self, bw_str):
@@ -64,11 +70,11 @@ class QoSManager:
         self._clear_existing_qos(net)
         
         # Calculate slice bandwidths and host memberships
-        slice_bandwidths = self._calculate_slice_bandwidths(slice_config)
-        host_slices = self._get_host_slices(slice_config)
+        self.slice_bandwidths = self._calculate_slice_bandwidths(slice_config)
+        self.host_slices = self._get_host_slices(slice_config)
         
         # Apply HTB configuration to each host
-        self._apply_htb_settings(net, slice_bandwidths, host_slices, slice_config)
+        self._apply_htb_settings(net, self.slice_bandwidths, self.host_slices, slice_config)
     
     def _clear_existing_qos(self, net):
         """
@@ -111,6 +117,7 @@ class QoSManager:
         Apply HTB qdisc and class configuration to each host
         """
         priority_map = {"high": 1, "medium": 2, "low": 3}
+        self.host_classes = {}
         
         for host_name, slices in host_slices.items():
             host = net.get(host_name)
@@ -140,6 +147,7 @@ class QoSManager:
             # Create classes for each slice this host belongs to
             for i, slice_name in enumerate(slices, start=1):
                 class_id = i * 10
+                self.host_classes.setdefault(host_name, {})[slice_name] = class_id
                 bandwidth = slice_bandwidths[slice_name]
                 bandwidth_kbps = int(bandwidth * 1000)  # Convert to kbps
                 slice_burst = int(bandwidth_kbps * 0.01)  # 10ms worth of data
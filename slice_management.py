@@ -16,10 +16,80 @@ from ryu.lib.packet import packet, ethernet, ipv4, tcp, udp, ether_types
 from ryu.topology.api import get_switch, get_link
 from ryu.controller import dpset
 from ryu.app.wsgi import WSGIApplication, ControllerBase, Response, route
+from ryu.lib import hub
+from contextlib import contextmanager
+from datetime import datetime
+from metrics import MetricsRegistry, CONTENT_TYPE
+import heapq
 import json
 import threading
 import time
 
+# Flow-mod command names used as metric labels
+FLOW_MOD_COMMANDS = {
+    ofproto_v1_3.OFPFC_ADD: 'add',
+    ofproto_v1_3.OFPFC_MODIFY: 'modify',
+    ofproto_v1_3.OFPFC_MODIFY_STRICT: 'modify_strict',
+    ofproto_v1_3.OFPFC_DELETE: 'delete',
+    ofproto_v1_3.OFPFC_DELETE_STRICT: 'delete_strict'
+}
+
+# Flow priority for each slice priority level
+PRIORITY_MAP = {"high": 50000, "medium": 30000, "low": 10000}
+
+# Activation modes: install all pair flows up front, or on first packet
+ACTIVATION_MODES = ("proactive", "reactive")
+
+# Reactive mode settings
+PACKET_IN_PRIORITY = 1           # Above the default drop rule, below slice flows
+PACKET_IN_METER_ID = 1           # Meter limiting packet-ins sent to the controller
+PACKET_IN_RATE_LIMIT = 100       # Packets per second per switch
+REACTIVE_IDLE_TIMEOUT = 30       # Seconds before an unused reactive flow expires
+REACTIVE_DROP_PRIORITY = PACKET_IN_PRIORITY + 1  # Drop flows for non-member pairs
+REACTIVE_DROP_IDLE_TIMEOUT = 10  # Seconds before an unused drop flow expires
+REACTIVE_DROP_COOKIE = 0xd0      # Cookie identifying non-member drop flows
+
+# Errors meaning a switch cannot rate limit packet-ins with a meter
+METER_UNSUPPORTED_ERRORS = {
+    (ofproto_v1_3.OFPET_METER_MOD_FAILED, ofproto_v1_3.OFPMMFC_OUT_OF_METERS),
+    (ofproto_v1_3.OFPET_METER_MOD_FAILED, ofproto_v1_3.OFPMMFC_OUT_OF_BANDS),
+    (ofproto_v1_3.OFPET_METER_MOD_FAILED, ofproto_v1_3.OFPMMFC_BAD_FLAGS),
+    (ofproto_v1_3.OFPET_METER_MOD_FAILED, ofproto_v1_3.OFPMMFC_BAD_BAND),
+    (ofproto_v1_3.OFPET_BAD_INSTRUCTION, ofproto_v1_3.OFPBIC_UNSUP_INST)
+}
+
+# Scheduled activation settings
+PRESTAGE_LEAD_TIME = 30          # Seconds before a scheduled activation to pre-stage its flows
+SCHEDULE_COOKIE_BASE = 1 << 32   # Cookie of staged flows is SCHEDULE_COOKIE_BASE | schedule id
+COOKIE_MASK = 0xffffffffffffffff
+
+
+def _parse_schedule_time(value):
+    """
+    Convert a schedule time to a UNIX timestamp
+    Args:
+        value: Epoch seconds (int/float), ISO 8601 string with a UTC offset, or None
+    Returns:
+        float timestamp, or None if value is None
+    Raises:
+        TypeError: value is neither a number nor a string
+        ValueError: value is not ISO 8601 or has no UTC offset
+    """
+    if value is None:
+        return None
+    # bool is an int subclass, but true/false is not a time
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise TypeError(f"expected epoch seconds or ISO 8601 string, got {value!r}")
+    if isinstance(value, (int, float)):
+        return float(value)
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    parsed = datetime.fromisoformat(value)
+    # Naive times would be read in the controller's local timezone
+    if parsed.tzinfo is None:
+        raise ValueError(f"'{value}' has no UTC offset (e.g. +00:00 or Z)")
+    return parsed.timestamp()
+
 class SimpleSwitchController(ControllerBase):
     """
     WSGI Controller for Network Slice Management
@@ -34,36 +104,35 @@ class SimpleSwitchController(ControllerBase):
         """
         REST API endpoint to activate a network slice
         Args:
-            req: HTTP request containing slice_name
+            req: HTTP request containing slice_name and optional mode
+                 ("proactive" or "reactive", default "proactive")
         Returns:
             HTTP response with activation status
         """
         try:
             body = json.loads(req.body.decode())
             slice_name = body.get('slice_name')
+            mode = body.get('mode', 'proactive')
             if not slice_name:
                 return Response(status=400, body=json.dumps({"error": "Missing slice_name"}))
+            if mode not in ACTIVATION_MODES:
+                return Response(status=400,
+                              body=json.dumps({"error": f"Invalid mode '{mode}'"}))
 
-            with self.simple_switch_app.lock:
+            with self.simple_switch_app.locked():
                 # Check if slice is already activated
                 if slice_name in self.simple_switch_app.slices:
                     return Response(status=409, 
                                   body=json.dumps({"error": f"Slice '{slice_name}' is already activated"}))
 
                 # Read topology file
-                with open("/tmp/topology.json", "r") as f:
-                    topology_data = json.load(f)
+                topology_data = self.simple_switch_app._load_topology()
                 
                 if slice_name not in topology_data["slices"]:
                     return Response(status=400, 
                                   body=json.dumps({"error": "Invalid slice configuration"}))
 
-                # Store slice info
-                self.simple_switch_app.slices[slice_name] = topology_data["slices"][slice_name]
-                self.simple_switch_app.logger.info(f"Starting to activate slice: {slice_name}")
-                
-                # Install flow rules
-                self.simple_switch_app._install_slice_flows(slice_name)
+                self.simple_switch_app._activate_slice(slice_name, mode, topology_data)
                 
                 return Response(status=200,
                               body=json.dumps({"message": f"Slice '{slice_name}' activated successfully"}))
@@ -86,16 +155,12 @@ class SimpleSwitchController(ControllerBase):
             if not slice_name:
                 return Response(status=400, body=json.dumps({"error": "Missing slice_name"}))
 
-            with self.simple_switch_app.lock:
+            with self.simple_switch_app.locked():
                 if slice_name not in self.simple_switch_app.slices:
                     return Response(status=404,
                                   body=json.dumps({"error": f"Slice '{slice_name}' is not activated"}))
 
-                # Remove flow rules
-                self.simple_switch_app._remove_slice_flows(slice_name)
-                
-                # Remove from active slices
-                del self.simple_switch_app.slices[slice_name]
+                self.simple_switch_app._deactivate_slice(slice_name)
                 
                 return Response(status=200,
                               body=json.dumps({"message": f"Slice '{slice_name}' deactivated successfully"}))
@@ -103,6 +168,96 @@ class SimpleSwitchController(ControllerBase):
         except Exception as e:
             return Response(status=500, body=json.dumps({"error": str(e)}))
 
+    @route('simpleswitch', '/simpleswitch/schedule', methods=['POST'])
+    def add_schedule(self, req, **kwargs):
+        """
+        REST API endpoint to schedule slice activation and/or deactivation
+        Args:
+            req: HTTP request containing slice_name, activate_at and/or
+                 deactivate_at (epoch seconds or ISO 8601) and optional mode
+        Returns:
+            HTTP response with the created schedule
+        """
+        try:
+            body = json.loads(req.body.decode())
+            slice_name = body.get('slice_name')
+            mode = body.get('mode', 'proactive')
+            if not slice_name:
+                return Response(status=400, body=json.dumps({"error": "Missing slice_name"}))
+            if mode not in ACTIVATION_MODES:
+                return Response(status=400,
+                              body=json.dumps({"error": f"Invalid mode '{mode}'"}))
+
+            try:
+                activate_at = _parse_schedule_time(body.get('activate_at'))
+                deactivate_at = _parse_schedule_time(body.get('deactivate_at'))
+            except (TypeError, ValueError) as e:
+                return Response(status=400, body=json.dumps({"error": f"Invalid time: {e}"}))
+            if activate_at is None and deactivate_at is None:
+                return Response(status=400,
+                              body=json.dumps({"error": "Missing activate_at or deactivate_at"}))
+            now = time.time()
+            for field, value in (("activate_at", activate_at), ("deactivate_at", deactivate_at)):
+                if value is not None and value <= now:
+                    return Response(status=400,
+                                  body=json.dumps({"error": f"{field} is in the past"}))
+            if activate_at is not None and deactivate_at is not None and deactivate_at <= activate_at:
+                return Response(status=400,
+                              body=json.dumps({"error": "deactivate_at must be after activate_at"}))
+
+            # Loading the topology refreshes host_ips, which lock holders read
+            with self.simple_switch_app.locked():
+                topology_data = self.simple_switch_app._load_topology()
+            if slice_name not in topology_data["slices"]:
+                return Response(status=400,
+                              body=json.dumps({"error": "Invalid slice configuration"}))
+
+            schedule = self.simple_switch_app.add_schedule(slice_name, mode, activate_at, deactivate_at)
+            return Response(status=201, body=json.dumps(schedule))
+
+        except Exception as e:
+            return Response(status=500, body=json.dumps({"error": str(e)}))
+
+    @route('simpleswitch', '/simpleswitch/schedule', methods=['GET'])
+    def list_schedules(self, req, **kwargs):
+        """
+        REST API endpoint listing scheduled slice activations
+        Returns:
+            HTTP response with all schedules and their state
+        """
+        return Response(status=200, body=json.dumps(self.simple_switch_app.list_schedules()))
+
+    @route('simpleswitch', '/simpleswitch/schedule/{schedule_id}', methods=['DELETE'],
+           requirements={'schedule_id': r'\d+'})
+    def cancel_schedule(self, req, **kwargs):
+        """
+        REST API endpoint to cancel a pending schedule
+        Args:
+            schedule_id: ID returned when the schedule was created
+        Returns:
+            HTTP response with cancellation status
+        """
+        try:
+            schedule_id = int(kwargs['schedule_id'])
+            if not self.simple_switch_app.cancel_schedule(schedule_id):
+                return Response(status=404,
+                              body=json.dumps({"error": f"Schedule {schedule_id} has no pending action"}))
+            return Response(status=200,
+                          body=json.dumps({"message": f"Schedule {schedule_id} cancelled"}))
+
+        except Exception as e:
+            return Response(status=500, body=json.dumps({"error": str(e)}))
+
+    @route('simpleswitch', '/metrics', methods=['GET'])
+    def metrics(self, req, **kwargs):
+        """
+        REST API endpoint exposing controller metrics
+        Returns:
+            HTTP response with metrics in Prometheus text format
+        """
+        return Response(status=200, content_type=CONTENT_TYPE,
+                        body=self.simple_switch_app.metrics.render())
+
 class SimpleSwitch(app_manager.RyuApp):
     """
     Main SDN Controller Application
@@ -120,10 +275,146 @@ class SimpleSwitch(app_manager.RyuApp):
         super(SimpleSwitch, self).__init__(*args, **kwargs)
         self.dpset = kwargs['dpset']
         self.slices = {}
+        self.slice_modes = {}
+        self.host_ips = {}
+        # (src_ip, dst_ip) -> set of active slices covering the pair
+        self.pair_slices = {}
+        # (src_ip, dst_ip) -> slice name, for slices activated in reactive mode
+        self.reactive_index = {}
+        # Datapath id -> xid of the meter mod, and datapaths that rejected it
+        self.meter_xids = {}
+        self.unmetered_datapaths = set()
         self.datapaths = {}
         self.lock = threading.Lock()
+        # Scheduled activations: id -> schedule, plus a heap of (time, seq, action, id) timers
+        self.schedules = {}
+        self.schedule_heap = []
+        # (src_ip, dst_ip) -> schedule whose staged drop flow covers the pair
+        self.staged_pairs = {}
+        self.schedule_lock = threading.Lock()
+        self.schedule_event = hub.Event()
+        self._next_schedule_id = 1
+        self._timer_seq = 0
+        self._init_metrics()
         wsgi = kwargs['wsgi']
         wsgi.register(SimpleSwitchController, {'simple_switch_app': self})
+        self.scheduler_thread = hub.spawn(self._scheduler_loop)
+
+    def _init_metrics(self):
+        """Create the metrics exposed at /metrics"""
+        self.metrics = MetricsRegistry()
+        self.activation_latency = self.metrics.histogram(
+            'slice_activation_duration_seconds',
+            'Time spent activating a slice and installing its flows',
+            ['slice'])
+        self.deactivation_latency = self.metrics.histogram(
+            'slice_deactivation_duration_seconds',
+            'Time spent deactivating a slice and removing its flows',
+            ['slice'])
+        self.flow_mods_sent = self.metrics.counter(
+            'flow_mods_sent',
+            'OpenFlow flow-mod messages sent to each datapath',
+            ['datapath', 'command'])
+        self.topology_reloads = self.metrics.counter(
+            'topology_reloads',
+            'Reads of the topology file from disk')
+        self.lock_wait = self.metrics.histogram(
+            'slice_lock_wait_seconds',
+            'Time spent waiting to acquire the slice management lock')
+        self.packet_ins = self.metrics.counter(
+            'packet_ins',
+            'IPv4 packet-ins handled in reactive mode',
+            ['result'])
+        self.schedule_jitter = self.metrics.histogram(
+            'schedule_fire_delay_seconds',
+            'Delay between the scheduled time and the start of a scheduled action',
+            ['action'])
+
+    @contextmanager
+    def locked(self):
+        """Acquire the slice lock, recording how long the caller waited for it"""
+        with self.lock_wait.time():
+            self.lock.acquire()
+        try:
+            yield
+        finally:
+            self.lock.release()
+
+    def _load_topology(self):
+        """
+        Read the topology configuration written by topology.py
+        Returns:
+            dict: Topology data (nodes, links, hosts, slices)
+        """
+        with open("/tmp/topology.json", "r") as f:
+            topology_data = json.load(f)
+        self.topology_reloads.inc()
+        self.host_ips = topology_data["hosts"]
+        return topology_data
+
+    def _slice_priority(self, slice_info):
+        """Return the flow priority for a slice configuration"""
+        return PRIORITY_MAP.get(slice_info["priority"], 10000)
+
+    def _slice_pairs(self, slice_info):
+        """
+        Get the (src_ip, dst_ip) pairs covered by a slice
+        Args:
+            slice_info: Slice configuration
+        Returns:
+            list: Ordered IP pairs between all distinct hosts of the slice
+        """
+        ips = [self.host_ips[host] for host in slice_info["hosts"]]
+        return [(src_ip, dst_ip) for src_ip in ips for dst_ip in ips if src_ip != dst_ip]
+
+    def _send_flow_mod(self, datapath, mod):
+        """
+        Send a flow-mod to a switch and account for it in the metrics
+        Args:
+            datapath: Switch to send the message to
+            mod: OFPFlowMod message
+        """
+        datapath.send_msg(mod)
+        self.flow_mods_sent.inc(datapath=datapath.id,
+                                command=FLOW_MOD_COMMANDS.get(mod.command, str(mod.command)))
+
+    def _activate_slice(self, slice_name, mode, topology_data, committed=None):
+        """
+        Mark a slice active and install its flow rules
+        Must be called with the slice lock held
+        Args:
+            slice_name: Name of the slice to activate
+            mode: "proactive" or "reactive"
+            topology_data: Loaded topology configuration
+            committed: (pairs, datapath IDs) whose staged flows were just committed (optional)
+        """
+        with self.activation_latency.time(slice=slice_name):
+            # Store slice info
+            self.slices[slice_name] = topology_data["slices"][slice_name]
+            self.slice_modes[slice_name] = mode
+            self.logger.info(f"Starting to activate slice: {slice_name}")
+
+            # Install flow rules, or only the packet-in rules in reactive mode
+            if mode == 'reactive':
+                self._activate_reactive_slice(slice_name)
+            else:
+                self._install_slice_flows(slice_name, topology_data, committed)
+
+    def _deactivate_slice(self, slice_name):
+        """
+        Remove the flow rules of an active slice and mark it inactive
+        Must be called with the slice lock held
+        Args:
+            slice_name: Name of the slice to deactivate
+        """
+        with self.deactivation_latency.time(slice=slice_name):
+            # Remove flow rules
+            self._remove_slice_flows(slice_name)
+
+            # Remove from active slices
+            del self.slices[slice_name]
+            if self.slice_modes.pop(slice_name, None) == 'reactive':
+                self._update_reactive_state()
 
     @set_ev_cls(ofp_event.EventOFPSwitchFeatures, CONFIG_DISPATCHER)
     def switch_features_handler(self, ev):
@@ -150,12 +441,15 @@ class SimpleSwitch(app_manager.RyuApp):
             if datapath.id in self.datapaths:
                 self.logger.info(f'Unregister datapath: {datapath.id}')
                 del self.datapaths[datapath.id]
+                self.meter_xids.pop(datapath.id, None)
+                self.unmetered_datapaths.discard(datapath.id)
 
     def install_default_flows(self, datapath):
         """
         Install initial flow rules:
         1. ARP packets: normal forwarding (priority 200)
         2. Default rule: drop all other traffic (priority 0)
+        Also installs the meter used to rate limit reactive packet-ins
         """
         ofproto = datapath.ofproto
         parser = datapath.ofproto_parser
@@ -165,13 +459,20 @@ class SimpleSwitch(app_manager.RyuApp):
         actions_arp = [parser.OFPActionOutput(ofproto.OFPP_NORMAL)]
         inst_arp = [parser.OFPInstructionActions(ofproto.OFPIT_APPLY_ACTIONS, actions_arp)]
         mod_arp = parser.OFPFlowMod(datapath=datapath, priority=200, match=match_arp, instructions=inst_arp)
-        datapath.send_msg(mod_arp)
+        self._send_flow_mod(datapath, mod_arp)
 
         # Default rule: drop all other traffic
         match_drop = parser.OFPMatch()
         inst_drop = []  # No actions means drop
         mod_drop = parser.OFPFlowMod(datapath=datapath, priority=0, match=match_drop, instructions=inst_drop)
-        datapath.send_msg(mod_drop)
+        self._send_flow_mod(datapath, mod_drop)
+
+        # Meter limiting the rate of packet-ins in reactive mode
+        self._send_packet_in_meter(datapath, ofproto.OFPMC_ADD)
+
+        # Switches joining while a reactive slice is active need the packet-in rule
+        if self.reactive_index:
+            self._send_packet_in_rule(datapath, enabled=True)
 
     def add_flow(self, datapath, priority, match, actions, buffer_id=None):
         """
@@ -195,64 +496,58 @@ class SimpleSwitch(app_manager.RyuApp):
         else:
             mod = parser.OFPFlowMod(datapath=datapath, priority=priority,
                                    match=match, instructions=inst)
-        datapath.send_msg(mod)
+        self._send_flow_mod(datapath, mod)
 
-    def _install_slice_flows(self, slice_name):
+    def _install_slice_flows(self, slice_name, topology_data=None, committed=None):
         """
         Install flow rules for a specific slice
+        Only pairs where this slice becomes the highest priority active slice get
+        a new flow; the lower priority flow it supersedes is removed. Pairs whose
+        staged flow was committed are only registered on the switches they were
+        staged on, so their cookies and counters are kept.
         Args:
             slice_name: Name of the slice to install flows for
+            topology_data: Already loaded topology configuration (optional)
+            committed: (pairs, datapath IDs) whose staged flows were just committed (optional)
         """
         try:
-            # Read topology configuration
-            with open("/tmp/topology.json", "r") as f:
-                topology_data = json.load(f)
+            # Read topology configuration unless the caller already did
+            if topology_data is None:
+                topology_data = self._load_topology()
             
             slice_info = self.slices.get(slice_name)
             if not slice_info:
                 return
             
             # Get slice priority
-            priority_map = {"high": 50000, "medium": 30000, "low": 10000}
-            priority = priority_map.get(slice_info["priority"], 10000)
+            priority = self._slice_priority(slice_info)
+            committed_pairs, committed_datapaths = committed or ((), ())
+            installed = 0
             
-            # Get hosts in this slice
-            hosts = slice_info["hosts"]
-            
-            # Install flows between all hosts in the slice
-            for src_host in hosts:
-                for dst_host in hosts:
-                    if src_host != dst_host:
-                        src_ip = topology_data["hosts"][src_host]
-                        dst_ip = topology_data["hosts"][dst_host]
-                        
-                        # Install flow rules on all switches
-                        for datapath in self.datapaths.values():
-                            parser = datapath.ofproto_parser
-                            ofproto = datapath.ofproto
-                            
-                            match = parser.OFPMatch(
-                                eth_type=0x0800,
-                                ipv4_src=src_ip,
-                                ipv4_dst=dst_ip
-                            )
-                            
-                            actions = [parser.OFPActionOutput(ofproto.OFPP_NORMAL)]
-                            inst = [parser.OFPInstructionActions(
-                                ofproto.OFPIT_APPLY_ACTIONS, actions)]
-                            
-                            mod = parser.OFPFlowMod(
-                                datapath=datapath,
-                                priority=priority,
-                                match=match,
-                                instructions=inst,
-                                command=ofproto.OFPFC_ADD,
-                                flags=ofproto.OFPFF_SEND_FLOW_REM
-                            )
-                            datapath.send_msg(mod)
-                            
-                            self.logger.info(
-                                f"Installed flow for {src_ip}->{dst_ip} on switch {datapath.id}")
+            # Install flows between all hosts in the slice on all switches
+            for pair in self._slice_pairs(slice_info):
+                # A staged drop flow could shadow this slice until its cutover
+                self._discard_staged_pair(pair)
+                holders = self.pair_slices.setdefault(pair, set())
+                old_priority = self._effective_priority(holders)
+                holders.add(slice_name)
+                if old_priority is not None and old_priority >= priority:
+                    # Already forwarded by an overlapping slice of equal or higher priority
+                    continue
+
+                src_ip, dst_ip = pair
+                datapaths = list(self.datapaths.values())
+                if pair in committed_pairs:
+                    datapaths = [dp for dp in datapaths if dp.id not in committed_datapaths]
+                for datapath in datapaths:
+                    self._send_pair_flow(datapath, src_ip, dst_ip, priority)
+                    if old_priority is not None:
+                        self._send_pair_delete(datapath, src_ip, dst_ip, old_priority)
+                if datapaths:
+                    installed += 1
+
+            self.logger.info(f"Installed {installed} flows for slice {slice_name} on "
+                             f"{len(self.datapaths)} switches")
                     
         except Exception as e:
             self.logger.error(f"Error installing flows for slice {slice_name}: {str(e)}")
@@ -260,45 +555,605 @@ class SimpleSwitch(app_manager.RyuApp):
     def _remove_slice_flows(self, slice_name):
         """
         Remove flow rules for a specific slice
+        Pairs still covered by another active slice keep forwarding: if this slice
+        held the effective rule, the rule of the next highest priority slice is
+        installed before this one is deleted.
         Args:
             slice_name: Name of the slice to remove flows for
         """
         try:
-            # Read topology configuration
-            with open("/tmp/topology.json", "r") as f:
-                topology_data = json.load(f)
+            # Refresh host addresses from the topology configuration
+            self._load_topology()
             
             slice_info = self.slices[slice_name]
-            priority_map = {"high": 50000, "medium": 30000, "low": 10000}
-            priority = priority_map.get(slice_info["priority"], 10000)
-            hosts = slice_info["hosts"]
-
-            # Remove flows between all hosts in the slice
-            for src_host in hosts:
-                for dst_host in hosts:
-                    if src_host != dst_host:
-                        src_ip = topology_data["hosts"][src_host]
-                        dst_ip = topology_data["hosts"][dst_host]
-
-                        for datapath in self.datapaths.values():
-                            ofproto = datapath.ofproto
-                            parser = datapath.ofproto_parser
-
-                            match = parser.OFPMatch(
-                                eth_type=0x0800,
-                                ipv4_src=src_ip,
-                                ipv4_dst=dst_ip
-                            )
-                            mod = parser.OFPFlowMod(
-                                datapath=datapath,
-                                command=ofproto.OFPFC_DELETE,
-                                out_port=ofproto.OFPP_ANY,
-                                out_group=ofproto.OFPG_ANY,
-                                match=match,
-                                priority=priority
-                            )
-                            datapath.send_msg(mod)
-                            self.logger.info(f"Removed flow for {src_ip}->{dst_ip} on switch {datapath.id}")
+            priority = self._slice_priority(slice_info)
+            reactive = self.slice_modes.get(slice_name) == 'reactive'
+            removed = 0
+
+            for pair in self._slice_pairs(slice_info):
+                holders = self.pair_slices.get(pair, set())
+                old_priority = self._effective_priority(holders)
+                holders.discard(slice_name)
+                new_priority = self._effective_priority(holders)
+                if not holders:
+                    self.pair_slices.pop(pair, None)
+
+                if reactive:
+                    # A flow installed on packet-in is shared with any slice using the same priority
+                    delete_priority = None
+                    if priority != new_priority and priority not in self._reactive_priorities(holders):
+                        delete_priority = priority
+                    add_priority = None
+                elif old_priority != new_priority:
+                    # This slice held the effective rule; hand over to the next slice, if any
+                    delete_priority = old_priority
+                    add_priority = new_priority
+                else:
+                    continue
+
+                src_ip, dst_ip = pair
+                for datapath in self.datapaths.values():
+                    if add_priority is not None:
+                        self._send_pair_flow(datapath, src_ip, dst_ip, add_priority)
+                    if delete_priority is not None:
+                        self._send_pair_delete(datapath, src_ip, dst_ip, delete_priority)
+                removed += 1
+
+            self.logger.info(f"Removed or downgraded {removed} flows for slice {slice_name} on "
+                             f"{len(self.datapaths)} switches")
 
         except Exception as e:
-            self.logger.error(f"Error removing flows for slice {slice_name}: {str(e)}")
\ No newline at end of file
+            self.logger.error(f"Error removing flows for slice {slice_name}: {str(e)}")
+
+    def _effective_priority(self, slice_names):
+        """
+        Get the priority of the proactive flow forwarding a host pair
+        Args:
+            slice_names: Active slices covering the pair
+        Returns:
+            Highest priority among the proactive slices, or None
+        """
+        priorities = [self._slice_priority(self.slices[name]) for name in slice_names
+                      if self.slice_modes.get(name) != 'reactive']
+        return max(priorities) if priorities else None
+
+    def _reactive_priorities(self, slice_names):
+        """Get the set of priorities of the reactive slices among slice_names"""
+        return {self._slice_priority(self.slices[name]) for name in slice_names
+                if self.slice_modes.get(name) == 'reactive'}
+
+    def _send_pair_delete(self, datapath, src_ip, dst_ip, priority):
+        """
+        Delete the src_ip->dst_ip flow with exactly the given priority on one switch
+        Args:
+            datapath: Switch to delete the flow from
+            src_ip: Source host IP
+            dst_ip: Destination host IP
+            priority: Priority of the flow rule to delete
+        """
+        ofproto = datapath.ofproto
+        parser = datapath.ofproto_parser
+
+        match = parser.OFPMatch(
+            eth_type=0x0800,
+            ipv4_src=src_ip,
+            ipv4_dst=dst_ip
+        )
+        mod = parser.OFPFlowMod(
+            datapath=datapath,
+            command=ofproto.OFPFC_DELETE_STRICT,
+            out_port=ofproto.OFPP_ANY,
+            out_group=ofproto.OFPG_ANY,
+            match=match,
+            priority=priority
+        )
+        self._send_flow_mod(datapath, mod)
+        self.logger.debug("Removed flow for %s->%s with priority %s on switch %s",
+                          src_ip, dst_ip, priority, datapath.id)
+
+    def _send_pair_flow(self, datapath, src_ip, dst_ip, priority, idle_timeout=0,
+                        cookie=0, staged=False):
+        """
+        Install a flow forwarding src_ip->dst_ip traffic on one switch
+        Args:
+            datapath: Switch to install the flow on
+            src_ip: Source host IP
+            dst_ip: Destination host IP
+            priority: Priority of the flow rule
+            idle_timeout: Seconds of inactivity before the switch removes the flow (0 = never)
+            cookie: Cookie identifying the flow (used for staged flows)
+            staged: Install the flow without actions so it drops until committed
+        """
+        parser = datapath.ofproto_parser
+        ofproto = datapath.ofproto
+
+        match = parser.OFPMatch(
+            eth_type=0x0800,
+            ipv4_src=src_ip,
+            ipv4_dst=dst_ip
+        )
+
+        if staged:
+            inst = []  # No actions means drop, like the default rule
+        else:
+            actions = [parser.OFPActionOutput(ofproto.OFPP_NORMAL)]
+            inst = [parser.OFPInstructionActions(
+                ofproto.OFPIT_APPLY_ACTIONS, actions)]
+
+        mod = parser.OFPFlowMod(
+            datapath=datapath,
+            cookie=cookie,
+            priority=priority,
+            match=match,
+            instructions=inst,
+            idle_timeout=idle_timeout,
+            command=ofproto.OFPFC_ADD,
+            flags=ofproto.OFPFF_SEND_FLOW_REM
+        )
+        self._send_flow_mod(datapath, mod)
+        self.logger.debug("Installed flow for %s->%s on switch %s",
+                          src_ip, dst_ip, datapath.id)
+
+    def _activate_reactive_slice(self, slice_name):
+        """
+        Activate a slice in reactive mode
+        Only the packet-in rule is installed; pair flows are added on first packet
+        Args:
+            slice_name: Name of the slice to activate
+        """
+        try:
+            for pair in self._slice_pairs(self.slices[slice_name]):
+                # A staged drop flow would shadow the packet-in rule until its cutover
+                self._discard_staged_pair(pair)
+                self.pair_slices.setdefault(pair, set()).add(slice_name)
+            self._update_reactive_state()
+            self.logger.info(f"Activated slice {slice_name} in reactive mode")
+        except Exception as e:
+            self.logger.error(f"Error activating reactive slice {slice_name}: {str(e)}")
+
+    def _update_reactive_state(self):
+        """
+        Rebuild the (src_ip, dst_ip) -> slice index from the reactive slices
+        and install or remove the packet-in rule on all switches accordingly
+        When several reactive slices cover the same pair the highest priority one wins
+        """
+        was_enabled = bool(self.reactive_index)
+
+        index = {}
+        for slice_name, mode in self.slice_modes.items():
+            if mode != 'reactive':
+                continue
+            slice_info = self.slices[slice_name]
+            priority = self._slice_priority(slice_info)
+            for pair in self._slice_pairs(slice_info):
+                current = index.get(pair)
+                if current is None or priority > self._slice_priority(self.slices[current]):
+                    index[pair] = slice_name
+        self.reactive_index = index
+
+        for datapath in self.datapaths.values():
+            if bool(index) != was_enabled:
+                self._send_packet_in_rule(datapath, enabled=bool(index))
+            if was_enabled:
+                # Membership changed, pairs dropped so far may now be allowed
+                self._clear_drop_flows(datapath)
+
+    def _send_packet_in_rule(self, datapath, enabled):
+        """
+        Install or remove the metered rule sending unmatched IPv4 traffic to the controller
+        Switches that rejected the meter get the rule without it
+        Args:
+            datapath: Switch to update
+            enabled: True to install the rule, False to remove it
+        """
+        ofproto = datapath.ofproto
+        parser = datapath.ofproto_parser
+        match = parser.OFPMatch(eth_type=ether_types.ETH_TYPE_IP)
+
+        if enabled:
+            actions = [parser.OFPActionOutput(ofproto.OFPP_CONTROLLER,
+                                              ofproto.OFPCML_NO_BUFFER)]
+            inst = [parser.OFPInstructionActions(ofproto.OFPIT_APPLY_ACTIONS, actions)]
+            if datapath.id not in self.unmetered_datapaths:
+                inst.insert(0, parser.OFPInstructionMeter(PACKET_IN_METER_ID))
+            mod = parser.OFPFlowMod(datapath=datapath, priority=PACKET_IN_PRIORITY,
+                                    match=match, instructions=inst)
+        else:
+            mod = parser.OFPFlowMod(datapath=datapath, command=ofproto.OFPFC_DELETE_STRICT,
+                                    out_port=ofproto.OFPP_ANY, out_group=ofproto.OFPG_ANY,
+                                    priority=PACKET_IN_PRIORITY, match=match)
+        self._send_flow_mod(datapath, mod)
+
+    def _send_packet_in_meter(self, datapath, command):
+        """
+        Add or modify the meter limiting the rate of packet-ins
+        Args:
+            datapath: Switch to configure
+            command: OFPMC_ADD, or OFPMC_MODIFY if the switch already has the meter
+        """
+        ofproto = datapath.ofproto
+        parser = datapath.ofproto_parser
+        bands = [parser.OFPMeterBandDrop(rate=PACKET_IN_RATE_LIMIT, burst_size=PACKET_IN_RATE_LIMIT // 10)]
+        meter = parser.OFPMeterMod(datapath=datapath, command=command,
+                                   flags=ofproto.OFPMF_PKTPS | ofproto.OFPMF_BURST,
+                                   meter_id=PACKET_IN_METER_ID, bands=bands)
+        datapath.send_msg(meter)
+        self.meter_xids[datapath.id] = meter.xid
+
+    def _send_drop_flow(self, datapath, src_ip, dst_ip):
+        """
+        Drop src_ip->dst_ip traffic in the switch for a while, so a flood between
+        hosts sharing no slice does not keep reaching the controller
+        Args:
+            datapath: Switch to install the flow on
+            src_ip: Source host IP
+            dst_ip: Destination host IP
+        """
+        parser = datapath.ofproto_parser
+        match = parser.OFPMatch(eth_type=ether_types.ETH_TYPE_IP,
+                                ipv4_src=src_ip, ipv4_dst=dst_ip)
+        mod = parser.OFPFlowMod(datapath=datapath, cookie=REACTIVE_DROP_COOKIE,
+                                priority=REACTIVE_DROP_PRIORITY, match=match,
+                                idle_timeout=REACTIVE_DROP_IDLE_TIMEOUT, instructions=[])
+        self._send_flow_mod(datapath, mod)
+
+    def _clear_drop_flows(self, datapath):
+        """Delete all non-member drop flows from a switch"""
+        ofproto = datapath.ofproto
+        parser = datapath.ofproto_parser
+        mod = parser.OFPFlowMod(datapath=datapath, cookie=REACTIVE_DROP_COOKIE,
+                                cookie_mask=COOKIE_MASK, command=ofproto.OFPFC_DELETE,
+                                out_port=ofproto.OFPP_ANY, out_group=ofproto.OFPG_ANY,
+                                match=parser.OFPMatch())
+        self._send_flow_mod(datapath, mod)
+
+    @set_ev_cls(ofp_event.EventOFPErrorMsg, [CONFIG_DISPATCHER, MAIN_DISPATCHER])
+    def _error_msg_handler(self, ev):
+        """
+        Handle OpenFlow errors
+        Meters outlive the controller connection, so a reconnecting switch may
+        already have the packet-in meter; it is then modified in place. A switch
+        without meter support rejects the meter (and any flow using it); reactive
+        mode then falls back to an unmetered packet-in rule
+        """
+        msg = ev.msg
+        datapath = msg.datapath
+        ofproto = datapath.ofproto
+        error = (msg.type, msg.code)
+        meter_reply = msg.xid == self.meter_xids.get(datapath.id)
+
+        if meter_reply and error == (ofproto.OFPET_METER_MOD_FAILED, ofproto.OFPMMFC_METER_EXISTS):
+            self.logger.info(f"Switch {datapath.id} already has the packet-in meter, updating it")
+            self._send_packet_in_meter(datapath, ofproto.OFPMC_MODIFY)
+            return
+
+        # A switch that does not know meter-mod messages at all rejects their type
+        unsupported = (error in METER_UNSUPPORTED_ERRORS or
+                       (meter_reply and error == (ofproto.OFPET_BAD_REQUEST, ofproto.OFPBRC_BAD_TYPE)))
+        if not unsupported:
+            self.logger.warning(f"OpenFlow error from switch {datapath.id}: "
+                                f"type={msg.type} code={msg.code}")
+            return
+        if datapath.id in self.unmetered_datapaths:
+            return
+
+        self.logger.warning(f"Switch {datapath.id} rejected the packet-in meter "
+                            f"(type={msg.type} code={msg.code}); reactive packet-ins "
+                            f"on this switch are not rate limited")
+        self.unmetered_datapaths.add(datapath.id)
+        if self.reactive_index:
+            self._send_packet_in_rule(datapath, enabled=True)
+
+    @set_ev_cls(ofp_event.EventOFPPacketIn, MAIN_DISPATCHER)
+    def _packet_in_handler(self, ev):
+        """
+        Handle packet-ins for slices activated in reactive mode
+        Installs the pair flow with an idle timeout on all switches if the
+        source and destination share a reactive slice, otherwise installs a
+        short-lived drop flow for the pair on the reporting switch
+        """
+        msg = ev.msg
+        datapath = msg.datapath
+        ofproto = datapath.ofproto
+        parser = datapath.ofproto_parser
+
+        ip = packet.Packet(msg.data).get_protocol(ipv4.ipv4)
+        if ip is None:
+            return
+
+        with self.locked():
+            slice_name = self.reactive_index.get((ip.src, ip.dst))
+            if slice_name is None:
+                self._send_drop_flow(datapath, ip.src, ip.dst)
+                self.packet_ins.inc(result='dropped')
+                self.logger.debug("Dropped packet-in %s->%s on switch %s: no shared slice",
+                                  ip.src, ip.dst, datapath.id)
+                return
+
+            priority = self._slice_priority(self.slices[slice_name])
+            for dp in self.datapaths.values():
+                self._send_pair_flow(dp, ip.src, ip.dst, priority,
+                                     idle_timeout=REACTIVE_IDLE_TIMEOUT)
+            self.packet_ins.inc(result='installed')
+
+        # Forward the packet that triggered the packet-in
+        data = msg.data if msg.buffer_id == ofproto.OFP_NO_BUFFER else None
+        out = parser.OFPPacketOut(datapath=datapath, buffer_id=msg.buffer_id,
+                                  in_port=msg.match['in_port'],
+                                  actions=[parser.OFPActionOutput(ofproto.OFPP_NORMAL)],
+                                  data=data)
+        datapath.send_msg(out)
+
+    def add_schedule(self, slice_name, mode, activate_at, deactivate_at):
+        """
+        Register a scheduled activation/deactivation window for a slice
+        Args:
+            slice_name: Name of the slice
+            mode: Activation mode ("proactive" or "reactive")
+            activate_at: Activation timestamp, or None
+            deactivate_at: Deactivation timestamp, or None
+        Returns:
+            dict: The created schedule
+        """
+        with self.schedule_lock:
+            schedule_id = self._next_schedule_id
+            self._next_schedule_id += 1
+            schedule = {
+                "id": schedule_id,
+                "slice_name": slice_name,
+                "mode": mode,
+                "activate_at": activate_at,
+                "deactivate_at": deactivate_at,
+                "state": "pending",
+                "cookie": SCHEDULE_COOKIE_BASE | schedule_id,
+                "priority": None,
+                "staged_pairs": [],
+                "staged_datapaths": []
+            }
+            self.schedules[schedule_id] = schedule
+
+            if activate_at is not None:
+                # Only proactive flows can be staged; reactive ones are installed on demand
+                if mode == 'proactive':
+                    self._push_timer(activate_at - PRESTAGE_LEAD_TIME, 'stage', schedule_id)
+                self._push_timer(activate_at, 'activate', schedule_id)
+            if deactivate_at is not None:
+                self._push_timer(deactivate_at, 'deactivate', schedule_id)
+
+        # Wake the scheduler so it recomputes its next deadline
+        self.schedule_event.set()
+        self.logger.info(f"Scheduled slice {slice_name}: activate_at={activate_at}, "
+                         f"deactivate_at={deactivate_at}")
+        return dict(schedule)
+
+    def list_schedules(self):
+        """Return a snapshot of all schedules ordered by id"""
+        with self.schedule_lock:
+            return [dict(self.schedules[schedule_id]) for schedule_id in sorted(self.schedules)]
+
+    def cancel_schedule(self, schedule_id):
+        """
+        Cancel the remaining timers of a schedule and discard its staged flows
+        An active slice stays active; only its scheduled deactivation is dropped
+        Args:
+            schedule_id: ID of the schedule
+        Returns:
+            bool: True if the schedule was cancelled
+        """
+        with self.schedule_lock:
+            schedule = self.schedules.get(schedule_id)
+            if schedule is None or schedule["state"] not in ("pending", "staged", "active"):
+                return False
+            # Timers stay in the heap and are skipped when they fire
+            schedule["state"] = "cancelled"
+
+        with self.locked():
+            self._discard_staged_flows(schedule)
+        return True
+
+    def _claim_schedule(self, schedule, expected, state):
+        """
+        Move a schedule to a new state unless a cancel or another timer got there first
+        Args:
+            schedule: Schedule to update
+            expected: States the schedule may be moved from
+            state: New state
+        Returns:
+            bool: True if the state was changed
+        """
+        with self.schedule_lock:
+            if schedule["state"] not in expected:
+                return False
+            schedule["state"] = state
+            return True
+
+    def _push_timer(self, when, action, schedule_id):
+        """Push a timer onto the schedule heap (schedule_lock must be held)"""
+        self._timer_seq += 1
+        heapq.heappush(self.schedule_heap, (when, self._timer_seq, action, schedule_id))
+
+    def _scheduler_loop(self):
+        """
+        Fire schedule timers in time order
+        Sleeps until the earliest timer in the heap or until a new schedule is added
+        """
+        while True:
+            with self.schedule_lock:
+                timeout = None
+                if self.schedule_heap:
+                    timeout = max(0, self.schedule_heap[0][0] - time.time())
+            self.schedule_event.wait(timeout)
+            self.schedule_event.clear()
+
+            while True:
+                with self.schedule_lock:
+                    if not self.schedule_heap or self.schedule_heap[0][0] > time.time():
+                        break
+                    when, _, action, schedule_id = heapq.heappop(self.schedule_heap)
+                    schedule = self.schedules[schedule_id]
+                    if schedule["state"] in ("cancelled", "failed", "skipped"):
+                        continue
+
+                self.schedule_jitter.observe(max(0, time.time() - when), action=action)
+                try:
+                    if action == 'stage':
+                        self._stage_scheduled_flows(schedule)
+                    elif action == 'activate':
+                        self._run_scheduled_activation(schedule)
+                    else:
+                        self._run_scheduled_deactivation(schedule)
+                except Exception as e:
+                    self._claim_schedule(schedule, ("pending", "staged", "active"), "failed")
+                    self.logger.error(f"Error running {action} for schedule {schedule_id}: {str(e)}")
+
+    def _stage_scheduled_flows(self, schedule):
+        """
+        Pre-stage the flows of a scheduled activation
+        Flows are installed at the slice priority without actions and tagged with
+        the schedule cookie, so they behave like the default drop rule until the
+        cutover rewrites their actions in a single flow-mod per switch.
+        Pairs already covered by an active slice or by another schedule are not
+        staged, since a drop rule at a higher priority would cut them off before
+        the cutover; pairs covered by a slice activated later are discarded again
+        by _discard_staged_pair.
+        Args:
+            schedule: Schedule to stage
+        """
+        with self.locked():
+            # A cancel may have won the race for the timer
+            if schedule["slice_name"] in self.slices or \
+                    not self._claim_schedule(schedule, ("pending",), "staged"):
+                return
+
+            topology_data = self._load_topology()
+            slice_info = topology_data["slices"][schedule["slice_name"]]
+            priority = self._slice_priority(slice_info)
+
+            pairs = [pair for pair in self._slice_pairs(slice_info)
+                     if pair not in self.pair_slices and pair not in self.staged_pairs]
+
+            for datapath in self.datapaths.values():
+                for src_ip, dst_ip in pairs:
+                    self._send_pair_flow(datapath, src_ip, dst_ip, priority,
+                                         cookie=schedule["cookie"], staged=True)
+                schedule["staged_datapaths"].append(datapath.id)
+
+            schedule["priority"] = priority
+            schedule["staged_pairs"] = pairs
+            for pair in pairs:
+                self.staged_pairs[pair] = schedule
+
+            self.logger.info(f"Staged {len(pairs)} flows for slice {schedule['slice_name']} "
+                             f"on {len(self.datapaths)} switches")
+
+    def _run_scheduled_activation(self, schedule):
+        """
+        Activate a slice at its scheduled time
+        Staged flows are committed first with one OFPFC_MODIFY per switch; the
+        regular installation then only registers the committed pairs and adds
+        flows for pairs and switches that were not staged.
+        A slice that is already active is left as is; if the schedule has a
+        deactivate_at, the slice is still deactivated when the window ends.
+        Args:
+            schedule: Schedule to activate
+        """
+        slice_name = schedule["slice_name"]
+        with self.locked():
+            if slice_name in self.slices:
+                state = "active" if schedule["deactivate_at"] is not None else "skipped"
+                if self._claim_schedule(schedule, ("pending", "staged"), state):
+                    self.logger.info(f"Scheduled activation skipped: slice {slice_name} is already active")
+                    self._discard_staged_flows(schedule)
+                return
+            if not self._claim_schedule(schedule, ("pending", "staged"), "active"):
+                return
+
+            committed = (set(schedule["staged_pairs"]), set(schedule["staged_datapaths"]))
+            self._commit_staged_flows(schedule)
+            topology_data = self._load_topology()
+            self._activate_slice(slice_name, schedule["mode"], topology_data, committed)
+            if schedule["deactivate_at"] is None:
+                self._claim_schedule(schedule, ("active",), "done")
+
+    def _run_scheduled_deactivation(self, schedule):
+        """
+        Deactivate a slice at its scheduled time
+        Args:
+            schedule: Schedule to deactivate
+        """
+        slice_name = schedule["slice_name"]
+        with self.locked():
+            if not self._claim_schedule(schedule, ("pending", "staged", "active"), "done"):
+                return
+            if slice_name in self.slices:
+                self._deactivate_slice(slice_name)
+            else:
+                self.logger.info(f"Scheduled deactivation: slice {slice_name} is not active")
+
+    def _commit_staged_flows(self, schedule):
+        """
+        Turn the staged flows of a schedule into forwarding flows
+        A single non-strict OFPFC_MODIFY filtered on the schedule cookie rewrites
+        the actions of all staged flows on a switch at once.
+        Args:
+            schedule: Schedule whose staged flows to commit
+        """
+        for datapath_id in schedule["staged_datapaths"]:
+            datapath = self.datapaths.get(datapath_id)
+            if datapath is None:
+                continue
+            ofproto = datapath.ofproto
+            parser = datapath.ofproto_parser
+
+            actions = [parser.OFPActionOutput(ofproto.OFPP_NORMAL)]
+            inst = [parser.OFPInstructionActions(ofproto.OFPIT_APPLY_ACTIONS, actions)]
+            mod = parser.OFPFlowMod(datapath=datapath, cookie=schedule["cookie"],
+                                    cookie_mask=COOKIE_MASK, command=ofproto.OFPFC_MODIFY,
+                                    match=parser.OFPMatch(), instructions=inst)
+            self._send_flow_mod(datapath, mod)
+        self._forget_staged_pairs(schedule)
+
+    def _discard_staged_flows(self, schedule):
+        """
+        Delete the staged flows of a schedule that will not be committed
+        Args:
+            schedule: Schedule whose staged flows to delete
+        """
+        for datapath_id in schedule["staged_datapaths"]:
+            datapath = self.datapaths.get(datapath_id)
+            if datapath is None:
+                continue
+            ofproto = datapath.ofproto
+            parser = datapath.ofproto_parser
+
+            mod = parser.OFPFlowMod(datapath=datapath, cookie=schedule["cookie"],
+                                    cookie_mask=COOKIE_MASK, command=ofproto.OFPFC_DELETE,
+                                    out_port=ofproto.OFPP_ANY, out_group=ofproto.OFPG_ANY,
+                                    match=parser.OFPMatch())
+            self._send_flow_mod(datapath, mod)
+        self._forget_staged_pairs(schedule)
+
+    def _discard_staged_pair(self, pair):
+        """
+        Delete the staged flow of a single pair, if any schedule staged it
+        The pair is then installed normally when that schedule activates.
+        Args:
+            pair: (src_ip, dst_ip) tuple
+        """
+        schedule = self.staged_pairs.pop(pair, None)
+        if schedule is None:
+            return
+        src_ip, dst_ip = pair
+        for datapath_id in schedule["staged_datapaths"]:
+            datapath = self.datapaths.get(datapath_id)
+            if datapath is not None:
+                self._send_pair_delete(datapath, src_ip, dst_ip, schedule["priority"])
+        schedule["staged_pairs"].remove(pair)
+
+    def _forget_staged_pairs(self, schedule):
+        """Drop the staging bookkeeping of a schedule once its flows are committed or deleted"""
+        for pair in schedule["staged_pairs"]:
+            if self.staged_pairs.get(pair) is schedule:
+                del self.staged_pairs[pair]
+        schedule["staged_pairs"] = []
+        schedule["staged_datapaths"] = []
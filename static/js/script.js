@@ -12,6 +12,18 @@ const sliceColors = {
     'emergency_response': '#F1C40F'      // Yellow
 };
 
+// Topology rendering settings
+const TOPOLOGY_WIDTH = 800;
+const TOPOLOGY_HEIGHT = 600;
+const DEFAULT_HOST_COLOR = '#6baed6';
+const CANVAS_NODE_THRESHOLD = 200;  // Use canvas instead of SVG above this many nodes
+const CANVAS_LABEL_LIMIT = 100;     // Hide canvas labels above this many nodes unless zoomed in
+const CANVAS_NODE_RADIUS = 8;
+const SETTLE_ALPHA = 0.05;          // Simulation energy when positions are already laid out
+
+// Current topology renderer, kept across refreshes
+let graph = null;
+
 /**
  * Initialize the application when DOM is loaded
  */
@@ -22,13 +34,15 @@ document.addEventListener('DOMContentLoaded', () => {
 });
 
 /**
- * Fetch network topology data from backend
+ * Fetch network topology data and precomputed layout from backend
  */
 async function fetchTopology() {
     try {
-        const response = await fetch('/api/topology');
-        const topology = await response.json();
-        displayTopology(topology);
+        const [topology, positions] = await Promise.all([
+            fetch('/api/topology').then(r => r.json()),
+            fetch('/api/topology/layout').then(r => r.ok ? r.json() : {}).catch(() => ({}))
+        ]);
+        displayTopology(topology, positions);
     } catch (error) {
         console.error('Error fetching topology:', error);
     }
@@ -125,7 +139,7 @@ async function handleActivateSlice(sliceName) {
         };
         
         // Update host colors in topology
-        updateHostColors();
+        updateHostColors(activeSlices[sliceName].hosts);
         
         alert(result.message);
         await fetchSlices();
@@ -162,10 +176,11 @@ async function handleDeactivateSlice(sliceName) {
         }
         
         // Update active slices state
+        const sliceHosts = activeSlices[sliceName] ? activeSlices[sliceName].hosts : undefined;
         delete activeSlices[sliceName];
         
         // Update host colors in topology
-        updateHostColors();
+        updateHostColors(sliceHosts);
         
         alert(result.message);
         await fetchSlices();
@@ -180,75 +195,114 @@ async function handleDeactivateSlice(sliceName) {
 
 /**
  * Draw network topology visualization
+ * Reuses the existing graph when possible so node positions and the force
+ * simulation stay stable between refreshes
  * @param {Object} topology - Network topology data
+ * @param {Object} positions - Precomputed node positions keyed by node ID
  */
-function displayTopology(topology) {
-    const width = 800;
-    const height = 600;
-    
-    // Clear existing SVG
-    d3.select("#network-topology svg").remove();
+function displayTopology(topology, positions = {}) {
+    const mode = chooseRenderMode(topology.nodes.length);
+    const nodes = prepareNodes(topology.nodes, positions);
 
-    const svg = d3.select("#network-topology").append("svg")
-        .attr("width", width)
-        .attr("height", height);
+    if (!graph || graph.mode !== mode) {
+        if (graph) {
+            graph.destroy();
+        }
+        graph = mode === 'canvas' ? createCanvasGraph() : createSvgGraph();
+    }
 
-    // Create force-directed graph
-    const simulation = d3.forceSimulation(topology.nodes)
-        .force("link", d3.forceLink(topology.links).id(d => d.id))
-        .force("charge", d3.forceManyBody().strength(-300))
-        .force("center", d3.forceCenter(width / 2, height / 2));
-
-    // Draw links
-    const link = svg.append("g")
-        .selectAll("line")
-        .data(topology.links)
-        .enter().append("line")
-        .attr("class", "link")
-        .style("stroke", "#999")
-        .style("stroke-width", 1);
-
-    // Create node groups
-    const node = svg.append("g")
-        .selectAll(".node")
-        .data(topology.nodes)
-        .enter().append("g")
-        .attr("class", "node")
-        .call(d3.drag()
-            .on("start", dragstarted)
-            .on("drag", dragged)
-            .on("end", dragended));
-
-    // Draw different shapes based on node type with increased size
-    node.each(function(d) {
-        const element = d3.select(this);
-        if (d.id.startsWith('h')) {  // Host nodes
-            element.append("rect")
-                .attr("width", 30)    // Increased to 1.5x (was 20)
-                .attr("height", 30)   // Increased to 1.5x (was 20)
-                .attr("x", -15)       // Adjust center position
-                .attr("y", -15)       // Adjust center position
-                .style("fill", "#6baed6")
-                .style("stroke", "#4292c6")
-                .style("stroke-width", 2);
-        } else {  // Switch nodes
-            element.append("circle")
-                .attr("r", 15)        // Increased to 1.5x (was 10)
-                .style("fill", "#6baed6")
-                .style("stroke", "#4292c6")
-                .style("stroke-width", 2);
+    graph.update(nodes, topology.links);
+    updateHostColors();
+}
+
+/**
+ * Pick SVG for small topologies and canvas for large ones
+ * The choice can be forced with ?render=svg or ?render=canvas
+ * @param {number} nodeCount - Number of nodes in the topology
+ * @returns {string} 'svg' or 'canvas'
+ */
+function chooseRenderMode(nodeCount) {
+    const requested = new URLSearchParams(window.location.search).get('render');
+    if (requested === 'svg' || requested === 'canvas') {
+        return requested;
+    }
+    return nodeCount > CANVAS_NODE_THRESHOLD ? 'canvas' : 'svg';
+}
+
+/**
+ * Seed node coordinates from the current graph, or from the server layout
+ * @param {Array} nodes - Topology nodes
+ * @param {Object} positions - Precomputed node positions keyed by node ID
+ * @returns {Array} Nodes with x/y set where known
+ */
+function prepareNodes(nodes, positions) {
+    const previous = new Map(graph ? graph.simulation.nodes().map(d => [d.id, d]) : []);
+    return nodes.map(d => {
+        const node = {...d};
+        const known = previous.get(d.id) || positions[d.id];
+        if (known) {
+            node.x = known.x;
+            node.y = known.y;
         }
-        
-        // Adjust label position for larger icons
-        element.append("text")
-            .attr("dx", 18)           // Increased offset for larger icons
-            .attr("dy", 4)
-            .style("font-size", "12px")
-            .text(d => d.id);
+        return node;
     });
+}
+
+/**
+ * Create the force simulation shared by both renderers
+ * @param {Function} onTick - Called on every simulation tick
+ * @returns {Object} D3 force simulation
+ */
+function createSimulation(onTick) {
+    return d3.forceSimulation()
+        .force("link", d3.forceLink().id(d => d.id))
+        .force("charge", d3.forceManyBody().strength(-300))
+        .force("center", d3.forceCenter(TOPOLOGY_WIDTH / 2, TOPOLOGY_HEIGHT / 2))
+        .on("tick", onTick);
+}
+
+/**
+ * Load new data into a simulation without restarting the layout from scratch
+ * @param {Object} simulation - D3 force simulation
+ * @param {Array} nodes - Nodes with seeded positions
+ * @param {Array} links - Topology links
+ */
+function updateSimulation(simulation, nodes, links) {
+    const seeded = nodes.every(d => d.x !== undefined);
+    simulation.nodes(nodes);
+    simulation.force("link").links(links);
+    // Seeded positions only need to settle; unknown ones need a full layout
+    simulation.alpha(seeded ? SETTLE_ALPHA : 1).restart();
+}
+
+/**
+ * Key identifying a link independently of whether its ends are resolved
+ * @param {Object} d - Link data
+ * @returns {string} Link key
+ */
+function linkKey(d) {
+    const id = end => typeof end === 'object' ? end.id : end;
+    return `${id(d.source)}-${id(d.target)}`;
+}
+
+/**
+ * Create the SVG renderer used for small topologies
+ * Nodes and links are keyed data joins, so an update only touches what changed
+ * @returns {Object} Renderer with update, setHostFill and destroy
+ */
+function createSvgGraph() {
+    const svg = d3.select("#network-topology").append("svg")
+        .attr("width", TOPOLOGY_WIDTH)
+        .attr("height", TOPOLOGY_HEIGHT);
+    const defs = svg.append("defs");
+    const linkLayer = svg.append("g");
+    const nodeLayer = svg.append("g");
+    const elements = new Map();
+
+    let link = linkLayer.selectAll("line");
+    let node = nodeLayer.selectAll(".node");
 
-    // Update force layout
-    simulation.on("tick", () => {
+    const simulation = createSimulation(() => {
         link
             .attr("x1", d => d.source.x)
             .attr("y1", d => d.source.y)
@@ -259,58 +313,50 @@ function displayTopology(topology) {
             .attr("transform", d => `translate(${d.x},${d.y})`);
     });
 
-    // Drag functions
-    function dragstarted(event, d) {
-        if (!event.active) simulation.alphaTarget(0.3).restart();
-        d.fx = d.x;
-        d.fy = d.y;
-    }
+    function update(nodes, links) {
+        updateSimulation(simulation, nodes, links);
 
-    function dragged(event, d) {
-        d.fx = event.x;
-        d.fy = event.y;
-    }
+        link = link
+            .data(links, linkKey)
+            .join(enter => enter.append("line")
+                .attr("class", "link")
+                .style("stroke", "#999")
+                .style("stroke-width", 1));
 
-    function dragended(event, d) {
-        if (!event.active) simulation.alphaTarget(0);
-        d.fx = null;
-        d.fy = null;
+        node = node
+            .data(nodes, d => d.id)
+            .join(enter => enter.append("g")
+                .attr("class", "node")
+                .call(dragBehavior(simulation))
+                .each(drawSvgNode));
+
+        elements.clear();
+        node.each(function(d) {
+            elements.set(d.id, this);
+        });
     }
-}
 
-/**
- * Update host colors based on active slices
- */
-function updateHostColors() {
-    // Get all host nodes
-    const hostNodes = d3.selectAll('.node').filter(d => d.id.startsWith('h'));
-    
-    hostNodes.each(function(d) {
-        const node = d3.select(this);
-        const rect = node.select('rect');
-        const hostId = d.id;
-        
-        // Find all active slices that this host belongs to
-        const belongingSlices = Object.entries(activeSlices)
-            .filter(([sliceName, sliceInfo]) => 
-                sliceInfo.active && sliceInfo.hosts.includes(hostId))
-            .map(([sliceName]) => sliceName);
-        
-        if (belongingSlices.length === 0) {
+    function setHostFill(hostId, slices) {
+        const element = elements.get(hostId);
+        if (!element) {
+            return;
+        }
+        const rect = d3.select(element).select('rect');
+
+        if (slices.length === 0) {
             // Use default color if host doesn't belong to any active slice
-            rect.style('fill', '#6baed6');
-        } else if (belongingSlices.length === 1) {
+            rect.style('fill', DEFAULT_HOST_COLOR);
+        } else if (slices.length === 1) {
             // Use slice color if host belongs to one slice
-            rect.style('fill', sliceColors[belongingSlices[0]]);
+            rect.style('fill', sliceColors[slices[0]]);
         } else {
             // Create gradient for hosts belonging to multiple slices
             const gradientId = `gradient-${hostId}`;
-            
+
             // Create or update gradient definition
-            let gradient = d3.select(`#${gradientId}`);
+            let gradient = defs.select(`#${gradientId}`);
             if (gradient.empty()) {
-                gradient = d3.select('svg').append('defs')
-                    .append('linearGradient')
+                gradient = defs.append('linearGradient')
                     .attr('id', gradientId)
                     .attr('x1', '0%')
                     .attr('y1', '0%')
@@ -319,18 +365,247 @@ function updateHostColors() {
             } else {
                 gradient.selectAll('*').remove();
             }
-            
+
             // Add gradient stops
-            belongingSlices.forEach((sliceName, index) => {
-                const offset = (index / (belongingSlices.length - 1)) * 100;
+            slices.forEach((sliceName, index) => {
+                const offset = (index / (slices.length - 1)) * 100;
                 gradient.append('stop')
                     .attr('offset', `${offset}%`)
                     .attr('stop-color', sliceColors[sliceName]);
             });
-            
+
             // Apply gradient
             rect.style('fill', `url(#${gradientId})`);
         }
+    }
+
+    function destroy() {
+        simulation.stop();
+        svg.remove();
+    }
+
+    return {mode: 'svg', simulation, update, setHostFill, destroy};
+}
+
+/**
+ * Draw the shape and label of one SVG node
+ * @param {Object} d - Node data
+ */
+function drawSvgNode(d) {
+    const element = d3.select(this);
+    if (d.type === 'host') {  // Host nodes
+        element.append("rect")
+            .attr("width", 30)    // Increased to 1.5x (was 20)
+            .attr("height", 30)   // Increased to 1.5x (was 20)
+            .attr("x", -15)       // Adjust center position
+            .attr("y", -15)       // Adjust center position
+            .style("fill", DEFAULT_HOST_COLOR)
+            .style("stroke", "#4292c6")
+            .style("stroke-width", 2);
+    } else {  // Switch nodes
+        element.append("circle")
+            .attr("r", 15)        // Increased to 1.5x (was 10)
+            .style("fill", DEFAULT_HOST_COLOR)
+            .style("stroke", "#4292c6")
+            .style("stroke-width", 2);
+    }
+
+    // Adjust label position for larger icons
+    element.append("text")
+        .attr("dx", 18)           // Increased offset for larger icons
+        .attr("dy", 4)
+        .style("font-size", "12px")
+        .text(d.id);
+}
+
+/**
+ * Drag behavior for SVG nodes
+ * @param {Object} simulation - D3 force simulation
+ * @returns {Object} D3 drag behavior
+ */
+function dragBehavior(simulation) {
+    function dragstarted(event, d) {
+        if (!event.active) simulation.alphaTarget(0.3).restart();
+        d.fx = d.x;
+        d.fy = d.y;
+    }
+
+    function dragged(event, d) {
+        d.fx = event.x;
+        d.fy = event.y;
+    }
+
+    function dragended(event, d) {
+        if (!event.active) simulation.alphaTarget(0);
+        d.fx = null;
+        d.fy = null;
+    }
+
+    return d3.drag()
+        .on("start", dragstarted)
+        .on("drag", dragged)
+        .on("end", dragended);
+}
+
+/**
+ * Create the canvas renderer used for large topologies
+ * Everything is drawn in a few batched paths, at most once per animation frame,
+ * with zoom/pan and node dragging handled through hit testing
+ * @returns {Object} Renderer with update, setHostFill and destroy
+ */
+function createCanvasGraph() {
+    const canvas = d3.select("#network-topology").append("canvas")
+        .attr("width", TOPOLOGY_WIDTH)
+        .attr("height", TOPOLOGY_HEIGHT);
+    const context = canvas.node().getContext("2d");
+    const hostFills = new Map();
+
+    let nodes = [];
+    let links = [];
+    let transform = d3.zoomIdentity;
+    let drawPending = false;
+
+    const simulation = createSimulation(scheduleDraw);
+
+    function scheduleDraw() {
+        if (!drawPending) {
+            drawPending = true;
+            requestAnimationFrame(draw);
+        }
+    }
+
+    function draw() {
+        drawPending = false;
+        context.save();
+        context.clearRect(0, 0, TOPOLOGY_WIDTH, TOPOLOGY_HEIGHT);
+        context.translate(transform.x, transform.y);
+        context.scale(transform.k, transform.k);
+
+        // Links in a single path
+        context.beginPath();
+        links.forEach(d => {
+            context.moveTo(d.source.x, d.source.y);
+            context.lineTo(d.target.x, d.target.y);
+        });
+        context.strokeStyle = "#999";
+        context.lineWidth = 1;
+        context.stroke();
+
+        // Switches in a single path
+        context.beginPath();
+        nodes.forEach(d => {
+            if (d.type !== 'host') {
+                context.moveTo(d.x + CANVAS_NODE_RADIUS, d.y);
+                context.arc(d.x, d.y, CANVAS_NODE_RADIUS, 0, 2 * Math.PI);
+            }
+        });
+        context.fillStyle = DEFAULT_HOST_COLOR;
+        context.fill();
+        context.strokeStyle = "#4292c6";
+        context.stroke();
+
+        // Hosts, split into one stripe per active slice
+        const size = CANVAS_NODE_RADIUS * 2;
+        nodes.forEach(d => {
+            if (d.type !== 'host') {
+                return;
+            }
+            const x = d.x - CANVAS_NODE_RADIUS;
+            const y = d.y - CANVAS_NODE_RADIUS;
+            const slices = hostFills.get(d.id) || [];
+            if (slices.length === 0) {
+                context.fillStyle = DEFAULT_HOST_COLOR;
+                context.fillRect(x, y, size, size);
+            } else {
+                const stripe = size / slices.length;
+                slices.forEach((sliceName, index) => {
+                    context.fillStyle = sliceColors[sliceName];
+                    context.fillRect(x + index * stripe, y, stripe, size);
+                });
+            }
+            context.strokeRect(x, y, size, size);
+        });
+
+        // Labels only when they are readable
+        if (nodes.length <= CANVAS_LABEL_LIMIT || transform.k >= 2) {
+            context.fillStyle = "#000";
+            context.font = "12px sans-serif";
+            nodes.forEach(d => context.fillText(d.id, d.x + CANVAS_NODE_RADIUS + 3, d.y + 4));
+        }
+
+        context.restore();
+    }
+
+    function findNode(event) {
+        const [x, y] = transform.invert(d3.pointer(event, canvas.node()));
+        return simulation.find(x, y, CANVAS_NODE_RADIUS * 2);
+    }
+
+    canvas.call(d3.drag()
+        .subject(event => findNode(event.sourceEvent))
+        .on("start", event => {
+            if (!event.active) simulation.alphaTarget(0.3).restart();
+            event.subject.fx = event.subject.x;
+            event.subject.fy = event.subject.y;
+        })
+        .on("drag", event => {
+            const [x, y] = transform.invert(d3.pointer(event.sourceEvent, canvas.node()));
+            event.subject.fx = x;
+            event.subject.fy = y;
+        })
+        .on("end", event => {
+            if (!event.active) simulation.alphaTarget(0);
+            event.subject.fx = null;
+            event.subject.fy = null;
+        }));
+
+    canvas.call(d3.zoom()
+        .scaleExtent([0.1, 8])
+        .on("zoom", event => {
+            transform = event.transform;
+            scheduleDraw();
+        }));
+
+    function update(newNodes, newLinks) {
+        nodes = newNodes;
+        links = newLinks;
+        updateSimulation(simulation, nodes, links);
+        scheduleDraw();
+    }
+
+    function setHostFill(hostId, slices) {
+        hostFills.set(hostId, slices);
+        scheduleDraw();
+    }
+
+    function destroy() {
+        simulation.stop();
+        canvas.remove();
+    }
+
+    return {mode: 'canvas', simulation, update, setHostFill, destroy};
+}
+
+/**
+ * Update host colors based on active slices
+ * @param {Array} hosts - Hosts whose slice membership changed (default: all hosts)
+ */
+function updateHostColors(hosts) {
+    if (!graph) {
+        return;
+    }
+    if (!hosts) {
+        hosts = graph.simulation.nodes().filter(d => d.type === 'host').map(d => d.id);
+    }
+
+    hosts.forEach(hostId => {
+        // Find all active slices that this host belongs to
+        const belongingSlices = Object.entries(activeSlices)
+            .filter(([sliceName, sliceInfo]) =>
+                sliceInfo.active && sliceInfo.hosts.includes(hostId))
+            .map(([sliceName]) => sliceName);
+
+        graph.setHostFill(hostId, belongingSlices);
     });
 }
 
@@ -1,17 +1,25 @@
 from mininet.topo import Topo
 from mininet.net import Mininet
 from mininet.node import RemoteController
+from mininet.link import Link, TCLink
 from mininet.cli import CLI
 from mininet.log import setLogLevel, info
+import argparse
 import json
 from qos_manager import QoSManager
+from qos_benchmark import QoSBenchmark
 
 class IndustrialTopo(Topo):
     """
     Industrial Network Topology
     Defines the network structure with switches, hosts, and slice configurations
     """
-    def __init__(self):
+    def __init__(self, link_bandwidth=None):
+        """
+        Args:
+            link_bandwidth: Shape every link to this bandwidth in Mbps (requires TCLink)
+        """
+        self.link_bandwidth = link_bandwidth
         # Initialize configuration before super().__init__()
         self.config = {
             # Switch definitions with descriptions
@@ -73,10 +81,13 @@ class IndustrialTopo(Topo):
         for host_id, host_info in self.config["hosts"].items():
             self.addHost(host_id, ip=host_info["ip"])
 
+        # Shaped links make slices compete for the same bottleneck
+        link_opts = {"bw": self.link_bandwidth} if self.link_bandwidth else {}
+
         # Add core switch links
-        self.addLink('s1', 's2')  # Core to production
-        self.addLink('s1', 's3')  # Core to monitoring
-        self.addLink('s1', 's4')  # Core to office
+        self.addLink('s1', 's2', **link_opts)  # Core to production
+        self.addLink('s1', 's3', **link_opts)  # Core to monitoring
+        self.addLink('s1', 's4', **link_opts)  # Core to office
 
         # Define host groups by area
         production_hosts = ['h1', 'h2', 'h3']
@@ -85,20 +96,49 @@ class IndustrialTopo(Topo):
 
         # Connect hosts to their respective area switches
         for host in production_hosts:
-            self.addLink('s2', host)
+            self.addLink('s2', host, **link_opts)
         for host in monitoring_hosts:
-            self.addLink('s3', host)
+            self.addLink('s3', host, **link_opts)
         for host in office_hosts:
-            self.addLink('s4', host)
+            self.addLink('s4', host, **link_opts)
 
-    def configure_qos(self, net):
-        """Configure QoS parameters for all hosts"""
-        qos_manager = QoSManager(total_bandwidth="10G")  # Using string format
+    def configure_qos(self, net, qos_manager):
+        """
+        Configure QoS parameters for all hosts
+        Args:
+            net: Mininet network instance
+            qos_manager: QoSManager to apply the slice configuration with
+        Returns:
+            QoSManager: The manager holding the applied configuration
+        """
         qos_manager.configure_qos(net, self.config["slices"])
+        return qos_manager
+
+def run_mininet(benchmark=False, duration=10, tolerance=0.1, report_file="/tmp/qos_benchmark.json",
+                total_bandwidth="10G", streams=4):
+    """
+    Initialize and run the Mininet network
+    Args:
+        benchmark: Run the QoS benchmark and exit instead of starting the CLI
+        duration: Length of each benchmark flow in seconds
+        tolerance: Allowed relative deviation from the slice bandwidth
+        report_file: Path of the benchmark JSON report
+        total_bandwidth: Bandwidth shared by the slices (e.g., "10G", "100M")
+        streams: Parallel TCP streams per benchmark flow
+    """
+    qos_manager = QoSManager(total_bandwidth=total_bandwidth)
 
-def run_mininet():
-    """Initialize and run the Mininet network"""
-    topo = IndustrialTopo()
+    # The benchmark shapes every link to the total bandwidth, giving its contention
+    # phase a bottleneck. The host side is replaced by the slice HTB; the switch
+    # side shapes traffic between switches and towards each host.
+    link_bandwidth = None
+    if benchmark:
+        if qos_manager.TOTAL_BANDWIDTH <= 1000:
+            link_bandwidth = qos_manager.TOTAL_BANDWIDTH
+        else:
+            info(f"*** Warning: TCLink cannot shape {qos_manager.TOTAL_BANDWIDTH}Mbps, "
+                 "links are left unlimited (use --total-bandwidth 1G or lower)\n")
+    topo = IndustrialTopo(link_bandwidth)
     
     # Wait for controller to start
     info('*** Waiting for controller at 127.0.0.1:6633 ...\n')
@@ -107,6 +147,7 @@ def run_mininet():
     net = Mininet(
         topo=topo, 
         controller=lambda name: RemoteController(name, ip='127.0.0.1', port=6633),
+        link=TCLink if link_bandwidth else Link,
         autoSetMacs=True,
         waitConnected=True
     )
@@ -142,7 +183,14 @@ def run_mininet():
         
         # Configure QoS settings
         info('*** Configuring QoS ...\n')
-        topo.configure_qos(net)
+        topo.configure_qos(net, qos_manager)
+        
+        if benchmark:
+            info('*** Running QoS benchmark\n')
+            QoSBenchmark(net, qos_manager, topo.config["slices"], topology_data["hosts"],
+                         duration=duration, tolerance=tolerance, streams=streams,
+                         link_bandwidth=link_bandwidth).run(report_file)
+            return
         
         info('*** Running CLI\n')
         CLI(net)
@@ -153,5 +201,21 @@ def run_mininet():
 topos = {'industrialtopo': IndustrialTopo}
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Industrial network topology")
+    parser.add_argument('--benchmark', action='store_true',
+                        help="measure per-slice QoS with iperf3 and exit")
+    parser.add_argument('--duration', type=int, default=10,
+                        help="length of each benchmark flow in seconds")
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help="allowed relative deviation from the slice bandwidth")
+    parser.add_argument('--report', default="/tmp/qos_benchmark.json",
+                        help="path of the benchmark JSON report")
+    parser.add_argument('--total-bandwidth', default="10G",
+                        help="bandwidth shared by the slices, e.g. 10G or 100M")
+    parser.add_argument('--streams', type=int, default=4,
+                        help="parallel TCP streams per benchmark flow")
+    args = parser.parse_args()
+
     setLogLevel('info')
-    run_mininet()
\ No newline at end of file
+    run_mininet(args.benchmark, args.duration, args.tolerance, args.report,
+                args.total_bandwidth, args.streams)
\ No newline at end of file